@@ -0,0 +1,62 @@
+import numpy as np
+
+# Numba is optional: without it the kernels below run as plain Python/NumPy
+try:
+    from numba import njit, prange
+except ImportError:
+    prange = range
+
+    def njit(*args, **kwargs):
+        """Stand-in for numba.njit that returns the function unchanged."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+# Harris-Benedict equation for BMR
+@njit(cache=True)
+def bmr_male(weight, height, age):
+    """BMR for men from weight (kg), height (cm) and age (years)."""
+    return 66.5 + (13.75 * weight) + (5.003 * height) - (6.75 * age)
+
+@njit(cache=True)
+def bmr_female(weight, height, age):
+    """BMR for women from weight (kg), height (cm) and age (years)."""
+    return 655.1 + (9.563 * weight) + (1.850 * height) - (4.676 * age)
+
+@njit(cache=True)
+def bmi(weight_kg, height_cm):
+    """BMI from weight (kg) and height (cm)."""
+    height_m = height_cm / 100
+    return weight_kg / (height_m ** 2)
+
+# Batch variants for what-if sweeps over arrays of equal length
+@njit(cache=True, parallel=True)
+def bmr_male_batch(weight, height, age):
+    """Element-wise bmr_male over 1-D arrays."""
+    if not (np.all(weight > 0) and np.all(height > 0) and np.all(age > 0)):
+        raise ValueError("inputs must be positive")
+    out = np.empty(weight.shape[0])
+    for i in prange(weight.shape[0]):
+        out[i] = 66.5 + (13.75 * weight[i]) + (5.003 * height[i]) - (6.75 * age[i])
+    return out
+
+@njit(cache=True, parallel=True)
+def bmr_female_batch(weight, height, age):
+    """Element-wise bmr_female over 1-D arrays."""
+    if not (np.all(weight > 0) and np.all(height > 0) and np.all(age > 0)):
+        raise ValueError("inputs must be positive")
+    out = np.empty(weight.shape[0])
+    for i in prange(weight.shape[0]):
+        out[i] = 655.1 + (9.563 * weight[i]) + (1.850 * height[i]) - (4.676 * age[i])
+    return out
+
+@njit(cache=True, parallel=True)
+def bmi_batch(weight_kg, height_cm):
+    """Element-wise bmi over 1-D arrays."""
+    if not (np.all(weight_kg > 0) and np.all(height_cm > 0)):
+        raise ValueError("inputs must be positive")
+    out = np.empty(weight_kg.shape[0])
+    for i in prange(weight_kg.shape[0]):
+        height_m = height_cm[i] / 100
+        out[i] = weight_kg[i] / (height_m ** 2)
+    return out
@@ -0,0 +1,350 @@
+import bisect
+import numpy as np
+from dataclasses import dataclass, field
+from datetime import date
+import json
+import os
+import re
+import sqlite3
+
+import _kernels
+
+# Define the file paths for persistent storage
+DATA_FILE = "health_data.json"
+DB_FILE = "health.db"
+
+# Number of most recent days shown on the calorie chart
+PLOT_DAYS = 30
+
+# Daily calorie totals are stored as int16
+MAX_DAILY_KCAL = int(np.iinfo(np.int16).max)
+
+# Dated records (BMI history and daily calories) live in SQLite, so each log
+# writes one row instead of rewriting the whole JSON file
+_DB = sqlite3.connect(DB_FILE, isolation_level=None, check_same_thread=False)
+_DB.execute("PRAGMA journal_mode=WAL")
+_DB.execute("CREATE TABLE IF NOT EXISTS bmi (date TEXT PRIMARY KEY, bmi REAL)")
+_DB.execute("CREATE TABLE IF NOT EXISTS cal (date TEXT PRIMARY KEY, kcal REAL)")
+
+@dataclass
+class SessionState:
+    """App data held in memory; daily calories are parallel arrays sorted by date."""
+    dates: np.ndarray = field(default_factory=lambda: np.empty(0, dtype='datetime64[D]'))
+    kcal: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int16))
+    tdee: np.float32 = np.float32(0)
+    profile: dict = field(default_factory=dict)
+
+    def daily_total(self, day):
+        """Returns the calories logged on a YYYY-MM-DD day."""
+        d = np.datetime64(day, 'D')
+        i = np.searchsorted(self.dates, d)
+        if i < len(self.dates) and self.dates[i] == d:
+            return int(self.kcal[i])
+        return 0
+
+    def add_calories(self, day, kcal):
+        """Adds calories to a YYYY-MM-DD day and returns that day's new total."""
+        d = np.datetime64(day, 'D')
+        i = np.searchsorted(self.dates, d)
+        if i < len(self.dates) and self.dates[i] == d:
+            self.kcal[i] += kcal
+        else:
+            # Insert at the sorted position so the arrays never need re-sorting
+            self.dates = np.insert(self.dates, i, d)
+            self.kcal = np.insert(self.kcal, i, kcal)
+        return int(self.kcal[i])
+
+# Global data store (will be loaded from/saved to a file)
+state = SessionState()
+
+def load_data():
+    """Loads data from the persistent JSON file and database."""
+    if os.path.exists(DATA_FILE):
+        with open(DATA_FILE, 'r') as f:
+            data = json.load(f)
+            state.tdee = np.float32(data.get('tdee_value', 0))
+            state.profile = data.get('personal_data', {})
+            # Move dated records kept by older versions into the database
+            _DB.executemany("INSERT OR IGNORE INTO bmi VALUES (?, ?)", data.get('bmi_history', {}).items())
+            _DB.executemany("INSERT OR IGNORE INTO cal VALUES (?, ?)", data.get('daily_calories', {}).items())
+        print("Data loaded successfully!")
+    else:
+        print("No data file found, starting with a clean slate.")
+
+    rows = _DB.execute("SELECT date, kcal FROM cal ORDER BY date").fetchall()
+    state.dates = np.array([d for d, _ in rows], dtype='datetime64[D]')
+    # Stored totals are whole kcal within the int16 range, rounded like manual entries
+    totals = [min(max(round(k), 0), MAX_DAILY_KCAL) for _, k in rows]
+    for (day, kcal), total in zip(rows, totals):
+        if total != kcal:
+            if kcal > MAX_DAILY_KCAL:
+                print(f"Warning: {day} total of {kcal} kcal is capped at {MAX_DAILY_KCAL} kcal.")
+            # Keep the database in step with the value held in memory
+            save_daily_total(day, total)
+    state.kcal = np.array(totals, dtype=np.int16)
+
+def save_data():
+    """Saves the current TDEE and profile to the persistent JSON file."""
+    data_to_save = {
+        'tdee_value': float(state.tdee),
+        'personal_data': state.profile
+    }
+    with open(DATA_FILE, 'w') as f:
+        json.dump(data_to_save, f, indent=4)
+    print("Data saved successfully!")
+
+def save_bmi(day, bmi):
+    """Records the BMI for a YYYY-MM-DD day."""
+    _DB.execute("INSERT OR REPLACE INTO bmi VALUES (?, ?)", (day, bmi))
+
+def save_daily_total(day, kcal):
+    """Records the calorie total for a YYYY-MM-DD day."""
+    _DB.execute("INSERT OR REPLACE INTO cal VALUES (?, ?)", (day, kcal))
+
+# Load data at the start of the program
+load_data()
+
+# Matplotlib is only imported once the first plot is drawn
+def _new_figure():
+    """Creates a 10x6 Figure and Axes on an offscreen Agg canvas."""
+    # Figure + FigureCanvasAgg skips pyplot's global figure manager
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    fig = Figure(figsize=(10, 6))
+    FigureCanvasAgg(fig)
+    return fig, fig.add_subplot(111)
+
+# The calorie chart is drawn on one Figure that is reused for every log;
+# its bars and TDEE line are created once and updated in place
+_FIG = None
+_AX = None
+_BARS = None
+_TDEE_LINE = None
+_LAID_OUT = False # tight_layout only needs to run on the first render
+
+def _calorie_chart():
+    """Returns the shared calorie chart Figure, Axes, bars and TDEE line, creating them once."""
+    global _FIG, _AX, _BARS, _TDEE_LINE
+    if _FIG is None:
+        _FIG, _AX = _new_figure()
+        _BARS = _AX.bar(range(PLOT_DAYS), np.zeros(PLOT_DAYS), color='#5DADE2')
+        _TDEE_LINE = _AX.axhline(y=0, color='red', linestyle='--')
+
+        # Customize plot
+        _AX.set_title("Daily Calorie Intake vs. TDEE", fontsize=16)
+        _AX.set_xlabel("Date")
+        _AX.set_ylabel("Calories (kcal)")
+        _AX.grid(axis='y', linestyle='--', alpha=0.7)
+    return _FIG, _AX, _BARS, _TDEE_LINE
+
+# Blank plot shared by every message, created on first use
+_EMPTY_FIG = None
+_EMPTY_AX = None
+
+# Helper function to create a blank plot with a specific message
+def create_empty_plot(message="No Data to Display"):
+    """Returns the blank plot showing a custom message for display in Gradio."""
+    global _EMPTY_FIG, _EMPTY_AX
+    if _EMPTY_FIG is None:
+        _EMPTY_FIG, _EMPTY_AX = _new_figure()
+        _EMPTY_AX.axis('off') # Hide axes for a blank plot
+    _EMPTY_AX.set_title(message, fontsize=16)
+    return _EMPTY_FIG
+
+# Helper function to convert inches to cm and lbs to kg
+def convert_to_metric(height, weight, units):
+    if units == "in/lbs":
+        height_cm = height * 2.54
+        weight_kg = weight * 0.453592
+    else:
+        height_cm = height
+        weight_kg = weight
+    return height_cm, weight_kg
+
+# Tab 1: BMI Calculator
+_DATE_RE = re.compile(r"([0-9]{4})-([0-9]{1,2})-([0-9]{1,2})")
+
+# BMI category boundaries; a BMI equal to a boundary falls in the higher category
+_BMI_BINS = (18.5, 24.9, 29.9)
+_BMI_CATS = ("Underweight", "Normal weight", "Overweight", "Obese")
+
+def classify_bmi_batch(bmi_values):
+    """Returns the BMI category for each value in an array of BMIs."""
+    return np.asarray(_BMI_CATS)[np.searchsorted(_BMI_BINS, bmi_values, side='right')]
+
+def calculate_and_track_bmi(height, weight, units, date_str):
+    """Calculates BMI, determines category, and tracks it over time."""
+    if min(height, weight) <= 0:
+        return 0, "Invalid input", "Please enter positive values for height and weight."
+
+    try:
+        # Validate the YYYY-MM-DD layout (month and day may skip the zero
+        # padding), then store it zero-padded if it is a real calendar date
+        match = _DATE_RE.fullmatch(date_str)
+        if not match:
+            raise ValueError(date_str)
+        y, m, d = (int(g) for g in match.groups())
+        date(y, m, d)
+        date_str = f"{y:04d}-{m:02d}-{d:02d}"
+    except ValueError:
+        return 0, "Invalid date format", "Please enter date in YYYY-MM-DD format."
+
+    height_cm, weight_kg = convert_to_metric(height, weight, units)
+
+    bmi = round(_kernels.bmi(weight_kg, height_cm), 2)
+
+    # Determine BMI category
+    category = _BMI_CATS[bisect.bisect_right(_BMI_BINS, bmi)]
+
+    # Add to history
+    save_bmi(date_str, bmi)
+    
+    return bmi, category, f"Your BMI is {bmi}. Category: {category} ✨"
+
+# Tab 2: Daily Metabolic Rate Calculator
+# Harris-Benedict BMR kernel per gender
+_BMR_KERNELS = {
+    "Male": _kernels.bmr_male,
+    "Female": _kernels.bmr_female
+}
+
+# Activity multipliers
+ACTIVITY_MULTIPLIERS = {
+    "Sedentary (little to no exercise)": 1.2,
+    "Lightly active (1-3 days/week)": 1.375,
+    "Moderately active (3-5 days/week)": 1.55,
+    "Very active (6-7 days/week)": 1.725,
+    "Extra active (daily intense exercise)": 1.9
+}
+
+def calculate_bmr_tdee(age, gender, height, weight, activity_level):
+    """Calculates BMR and TDEE based on the Harris-Benedict equation."""
+    if min(age, height, weight) <= 0:
+        return 0, 0, 0, 0, 0, "Please enter positive values for age, height, and weight. 🙏"
+
+    # Harris-Benedict Equation for BMR
+    bmr = _BMR_KERNELS[gender](weight, height, age)
+    
+    tdee = bmr * ACTIVITY_MULTIPLIERS.get(activity_level, 1.2)
+    
+    # Calorie goals
+    loss_calories = tdee - 500
+    gain_calories = tdee + 500
+    
+    # Store TDEE for the other tab
+    state.tdee = np.float32(tdee)
+    
+    save_data() # Save data after every TDEE calculation
+    
+    # Calorie figures are shown as whole kcal
+    return round(bmr), round(tdee), round(tdee), round(loss_calories), round(gain_calories), "Results updated successfully! 💖"
+
+# Tab 3: Food Tracker
+def log_food_and_plot(food, manual_food_name, manual_calories):
+    """Logs food calories and returns the updated daily calories data and a plot."""
+    global _LAID_OUT
+
+    calories_to_add = 0
+    food_name_to_log = ""
+    log_status_message = ""
+    today_str = date.today().isoformat()
+    
+    if food in FOOD_TABLE:
+        food_name_to_log, calories_to_add = FOOD_TABLE[food]
+    elif manual_calories is not None and manual_calories > 0 and manual_food_name:
+        calories_to_add = round(manual_calories) # Calories are stored as whole kcal
+        food_name_to_log = manual_food_name
+    
+    if calories_to_add <= 0 or not food_name_to_log:
+        log_status_message = "Oops! Please enter a valid calorie amount and food name. 😟"
+        return (state.daily_total(today_str), create_empty_plot(log_status_message), log_status_message)
+
+    if state.daily_total(today_str) + calories_to_add > MAX_DAILY_KCAL:
+        log_status_message = f"Oops! A day can hold at most {MAX_DAILY_KCAL} kcal. 😟"
+        return (state.daily_total(today_str), create_empty_plot(log_status_message), log_status_message)
+
+    # Log food
+    today_total = state.add_calories(today_str, calories_to_add)
+    save_daily_total(today_str, today_total)
+    
+    log_status_message = f"Yay! Logged: {food_name_to_log} - {calories_to_add} kcal 🎉"
+
+    # Create the plot
+    if state.tdee == 0:
+        return (today_total, create_empty_plot("Please calculate your TDEE in Tab 2 first! ☝️"), "Please calculate your TDEE in Tab 2 first! ☝️")
+
+    # If there's no food data, return an empty plot
+    if state.dates.size == 0:
+        return (0, create_empty_plot(), "No food logged yet. Let's add some! 🥗")
+    
+
+    # Prepare data for plotting
+    dates = np.datetime_as_string(state.dates[-PLOT_DAYS:])
+    calories = state.kcal[-PLOT_DAYS:]
+
+    # Plot: show one bar per logged day and hide the unused ones
+    fig, ax, bars, tdee_line = _calorie_chart()
+    for i, rect in enumerate(bars):
+        if i < len(calories):
+            rect.set_height(calories[i])
+            rect.set_visible(True)
+        else:
+            rect.set_visible(False)
+    ax.set_xticks(range(len(dates)))
+    ax.set_xticklabels(dates, rotation=45, ha='right')
+    ax.set_xlim(-0.5, len(dates) - 0.5)
+    ax.set_ylim(0, max(calories.max(), state.tdee) * 1.05)
+
+    # Add TDEE line
+    tdee_line.set_ydata([state.tdee, state.tdee])
+    tdee_line.set_label(f"TDEE ({round(state.tdee)} kcal)")
+    ax.legend(handles=[tdee_line], loc='upper left')
+
+    if not _LAID_OUT:
+        fig.tight_layout()
+        _LAID_OUT = True
+    
+    return today_total, fig, log_status_message
+
+# Tab 4: Profile
+def save_profile_data(name, email, goal):
+    state.profile['name'] = name
+    state.profile['email'] = email
+    state.profile['goal'] = goal
+    
+    save_data() # Save data after every profile update
+    
+    return f"Profile updated for {name}! Good luck with your goal: {goal}! 🥳"
+
+
+# Define common foods for the dropdown
+# รายการอาหารไทยยอดฮิตพร้อมปริมาณแคลอรี่โดยประมาณ
+common_foods = [
+    "Chicken with bazil - 500 kcal",
+    "Omelet - 450 kcal",
+    "Tom Yum Kung - 90 kcal",
+    "Phad Thai - 550 kcal",
+    "Chicken Green Curry - 240 kcal",
+    "Papaya Salad - 70 kcal",
+    "Stew Pork Leg - 650 kcal",
+    "Chicken Rice - 600 kcal",
+    "Chicken Massaman - 400 kcal",
+    "Phad See Ew - 550 kcal",
+    "Rice - 130 kcal",
+    "Thai Tea - 200 kcal",
+    "Mango Sticky Rice - 350 kcal",
+    "Coconut Milk Ice Cream - 280 kcal",
+    "Thai-style fried rice - 550 kcal",
+    "Pork Satay - 150 kcal",
+    "Green Papaya Salad with Salted Egg - 180 kcal",
+    "Pad Krapow (Stir-fried Basil) - 450 kcal",
+    "Other"
+]
+
+# Parse the dropdown entries once: "Name - 123 kcal" -> ("Name", 123)
+FOOD_TABLE = {}
+for entry in common_foods:
+    if entry == "Other":
+        continue
+    name, kcal = entry.rsplit(" - ", 1)
+    FOOD_TABLE[entry] = (name, int(kcal[:-len(" kcal")]))